@@ -1,11 +1,15 @@
+import threading
+import time
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 import os
 from dotenv import load_dotenv
 from fastapi import HTTPException, status
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from authenticate.models import User
+from authenticate.hashing import pwd_context
+from tracing import record_cache
 load_dotenv()
 
 SECRET_KEY = os.getenv("JWT_SECRET")
@@ -13,8 +17,8 @@ if not SECRET_KEY:
     raise RuntimeError("JWT_SECRET is not set in environment. Ensure .env contains JWT_SECRET")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -41,16 +45,18 @@ def create_access_token(subject: object):
 
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
-def decode_access_token(token: str):
+def decode_access_payload(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("sub")
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError as e:
         msg = str(e).lower()
         if "expire" in msg or "expired" in msg:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+def decode_access_token(token: str):
+    return decode_access_payload(token).get("sub")
+
 
 def get_current_user(token: str, db: Session) -> User:
     """Validate JWT `token`, extract `sub` (email), query DB for User, raise 401 if invalid/not found."""
@@ -70,4 +76,110 @@ def get_current_user(token: str, db: Session) -> User:
         )
 
     return user
-    
\ No newline at end of file
+
+
+class TokenCache:
+    """
+    Small TTL cache of validated tokens -> user ids.
+
+    An entry lives for at most `ttl` seconds and never past the token's own
+    `exp`, so a hit is always a token that was valid when it was cached and
+    whose user existed at that time.
+    """
+
+    def __init__(self, ttl: int = TOKEN_CACHE_TTL_SECONDS, max_size: int = TOKEN_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = {}  # token -> (user_id, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            user_id, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            return user_id
+
+    def put(self, token: str, user_id: int, token_exp: float = None):
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._evict()
+            self._entries[token] = (user_id, expires_at)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in [t for t, (uid, _) in self._entries.items() if uid == user_id]:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        now = time.time()
+        expired = [t for t, (_, exp) in self._entries.items() if exp <= now]
+        for token in expired:
+            del self._entries[token]
+        # Still full: drop the oldest insertions (dicts keep insertion order)
+        overflow = len(self._entries) - self.max_size + 1
+        for token in list(self._entries)[:max(overflow, 0)]:
+            del self._entries[token]
+
+
+token_cache = TokenCache()
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    token_cache.invalidate_user(target.id)
+
+
+def resolve_user_id(token: str, db_factory) -> int:
+    """
+    Return the user id for `token`, hitting the DB only on a cache miss.
+
+    `db_factory` is called to open a session only when a lookup is needed.
+    Tokens carrying a `uid` claim are checked by primary key; older tokens
+    with only `sub` fall back to the email lookup.
+    """
+    user_id = token_cache.get(token)
+    record_cache("token", user_id is not None)
+    if user_id is not None:
+        return user_id
+
+    payload = decode_access_payload(token)
+    email = payload.get("sub")
+    uid = payload.get("uid")
+
+    if not email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+
+    db = db_factory()
+    try:
+        query = db.query(User.id)
+        if uid is not None:
+            query = query.filter(User.id == uid, User.email == email)
+        else:
+            query = query.filter(User.email == email)
+        row = query.first()
+    finally:
+        db.close()
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
+    token_cache.put(token, row.id, payload.get("exp"))
+    return row.id
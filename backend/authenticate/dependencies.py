@@ -1,7 +1,7 @@
 from database import SessionLocal
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from authenticate.auth import get_current_user
+from authenticate.auth import resolve_user_id
 from authenticate.models import User
 from sqlalchemy.orm import Session
 
@@ -15,11 +15,11 @@ def get_db():
         db.close()
 
 def get_current_user_id(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> int:
     """
-    Extract token from Authorization header, validate, return user.id
+    Extract token from Authorization header, validate, return user.id.
+    Cached tokens skip both JWT decoding and the DB lookup.
     """
     token = credentials.credentials
 
@@ -30,7 +30,7 @@ def get_current_user_id(
         )
 
     try:
-        user = get_current_user(token, db)
+        return resolve_user_id(token, SessionLocal)
     except HTTPException as e:
         # Pass the HTTPException directly
         raise e
@@ -38,6 +38,4 @@ def get_current_user_id(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
-        )
-
-    return user.id
\ No newline at end of file
+        )
\ No newline at end of file
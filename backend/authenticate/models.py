@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -28,7 +28,12 @@ class Conversation(Base):
     messages = relationship(
         "Message",
         back_populates="conversation",
-        cascade="all, delete"
+        cascade="all, delete",
+        order_by="[Message.created_at, Message.id]"
+    )
+
+    __table_args__ = (
+        Index("ix_conversations_user_id_created_at", "user_id", "created_at"),
     )
 
 
@@ -41,4 +46,8 @@ class Message(Base):
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    conversation = relationship("Conversation", back_populates="messages")
\ No newline at end of file
+    conversation = relationship("Conversation", back_populates="messages")
+
+    __table_args__ = (
+        Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Benchmark per-request auth overhead of the bearer-token dependency.
+
+Compares the previous path (decode JWT + `User` query by email on every
+request) with `resolve_user_id` (TTL token cache, DB only on a miss).
+
+Usage (from backend/):
+    python benchmarks/bench_auth.py --requests 5000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.sqlite")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+from database import engine, Base, SessionLocal
+from authenticate.models import User
+from authenticate.auth import create_access_token, get_current_user, resolve_user_id, token_cache
+
+
+def per_request_us(fn, n: int) -> dict:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": round(sum(samples) / n, 2),
+        "p50_us": round(samples[n // 2], 2),
+        "p99_us": round(samples[int(n * 0.99)], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(full_name="Bench", email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    token = create_access_token({"sub": "bench@example.com", "uid": user_id})
+
+    def before():
+        # Previous dependency: a session per request + decode + email lookup
+        db = SessionLocal()
+        try:
+            return get_current_user(token, db).id
+        finally:
+            db.close()
+
+    def after_miss():
+        token_cache.clear()
+        return resolve_user_id(token, SessionLocal)
+
+    def after_hit():
+        return resolve_user_id(token, SessionLocal)
+
+    resolve_user_id(token, SessionLocal)  # warm the cache
+
+    report = {
+        "requests": args.requests,
+        "before": per_request_us(before, args.requests),
+        "after_cache_miss": per_request_us(after_miss, args.requests),
+        "after_cache_hit": per_request_us(after_hit, args.requests),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
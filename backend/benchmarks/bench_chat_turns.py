@@ -0,0 +1,140 @@
+"""
+Count DB statements per chat turn: direct history query + per-turn commit
+versus the history cache + batched message writer.
+
+Simulates the DB side of `/ask` (conversation lookup, history for the
+prompt, persisting the user/assistant pair) across concurrent threads.
+The LLM call is replaced by a short sleep.
+
+Usage (from backend/):
+    python benchmarks/bench_chat_turns.py --conversations 50 --turns 20 --threads 8
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.sqlite")
+
+from sqlalchemy import event, func
+from database import engine, Base, SessionLocal
+from authenticate.models import User, Conversation, Message
+from conversation.history import MAX_HISTORY, HistoryCache, MessageWriter
+
+statements = 0
+_count_lock = threading.Lock()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    global statements
+    with _count_lock:
+        statements += 1
+
+
+def seed(n_conversations: int) -> list:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(full_name="Bench", email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    convos = [Conversation(user_id=user.id, title="Seeded") for _ in range(n_conversations)]
+    db.add_all(convos)
+    db.commit()
+    ids = [c.id for c in convos]
+    db.close()
+    return ids
+
+
+def turn_direct(conversation_id: int, i: int, llm_delay: float):
+    db = SessionLocal()
+    try:
+        db.query(Conversation).filter(Conversation.id == conversation_id).first()
+        history = (
+            db.query(Message)
+            .filter(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc())
+            .limit(MAX_HISTORY)
+            .all()
+        )
+        "\n".join(f"{m.role}: {m.content}" for m in reversed(history))
+        time.sleep(llm_delay)
+        db.add_all([
+            Message(conversation_id=conversation_id, role="user", content=f"q{i}"),
+            Message(conversation_id=conversation_id, role="assistant", content=f"a{i}"),
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def make_cached_turn(cache: HistoryCache):
+    def turn_cached(conversation_id: int, i: int, llm_delay: float):
+        db = SessionLocal()
+        try:
+            db.query(Conversation).filter(Conversation.id == conversation_id).first()
+            history = cache.recent(db, conversation_id)
+            "\n".join(f"{role}: {content}" for role, content in history)
+            time.sleep(llm_delay)
+            cache.append(conversation_id, "user", f"q{i}")
+            cache.append(conversation_id, "assistant", f"a{i}")
+        finally:
+            db.close()
+    return turn_cached
+
+
+def run(turn, ids: list, turns: int, threads: int, llm_delay: float) -> dict:
+    global statements
+    statements = 0
+    jobs = [(cid, i) for i in range(turns) for cid in ids]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda job: turn(job[0], job[1], llm_delay), jobs))
+    elapsed = time.perf_counter() - t0
+    return {
+        "turns": len(jobs),
+        "statements": statements,
+        "statements_per_turn": round(statements / len(jobs), 3),
+        "turns_per_s": round(len(jobs) / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--llm-delay", type=float, default=0.005)
+    args = parser.parse_args()
+
+    ids = seed(args.conversations)
+    direct = run(turn_direct, ids, args.turns, args.threads, args.llm_delay)
+
+    ids = seed(args.conversations)
+    writer = MessageWriter(SessionLocal)
+    writer.start()
+    cache = HistoryCache(writer)
+    cached = run(make_cached_turn(cache), ids, args.turns, args.threads, args.llm_delay)
+    writer.stop()
+    cached["history_cache_hits"] = cache.hits
+    cached["history_cache_misses"] = cache.misses
+
+    db = SessionLocal()
+    stored = db.query(func.count(Message.id)).scalar()
+    db.close()
+    assert stored == 2 * args.conversations * args.turns, stored
+
+    print(json.dumps({"direct": direct, "cached_batched": cached}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Throughput and payload size of the /embed_texts response formats.
+
+Serialization-only mode (default) encodes random MiniLM-sized arrays with
+each format, including the previous `[e.tolist() for e in ...]` +
+jsonable_encoder path, so no model is needed. With --base-url it instead
+posts real batches to a running API and times the full round trip.
+
+Usage (from backend/):
+    python benchmarks/bench_embed_formats.py --batch 1024
+    python benchmarks/bench_embed_formats.py --batch 1024 --base-url http://localhost:8000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from embedding_formats import encode_embeddings, ndjson_lines
+
+VARIANTS = [
+    ("json", "float32"),
+    ("base64", "float32"),
+    ("base64", "float16"),
+    ("binary", "float32"),
+    ("binary", "float16"),
+    ("ndjson", "float32"),
+]
+
+
+def timed(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def serialization(batch: int, dim: int, sub_batch: int, repeat: int) -> dict:
+    embeddings = np.random.rand(batch, dim).astype("float32")
+    report = {}
+
+    def legacy():
+        body = jsonable_encoder({"embeddings": [e.tolist() for e in embeddings]})
+        return json.dumps(body).encode()
+
+    seconds, body = timed(legacy, repeat)
+    report["legacy_json"] = {"ms": round(seconds * 1000, 2), "bytes": len(body)}
+
+    for fmt, dtype in VARIANTS:
+        if fmt == "ndjson":
+            def run():
+                batches = ((i, embeddings[i:i + sub_batch]) for i in range(0, batch, sub_batch))
+                return "".join(ndjson_lines(batches)).encode()
+        else:
+            run = lambda: encode_embeddings(embeddings, fmt, dtype, key="embeddings").body
+        seconds, body = timed(run, repeat)
+        report[f"{fmt}_{dtype}"] = {"ms": round(seconds * 1000, 2), "bytes": len(body)}
+
+    return report
+
+
+def end_to_end(base_url: str, batch: int, repeat: int) -> dict:
+    texts = [f"Clause {i}: the Lessee shall give written notice within thirty days." for i in range(batch)]
+    report = {}
+    with httpx.Client(base_url=base_url, timeout=300) as client:
+        for fmt, dtype in VARIANTS:
+            def run():
+                r = client.post("/embed_texts", params={"format": fmt, "dtype": dtype}, json={"texts": texts})
+                r.raise_for_status()
+                return r.content
+            seconds, body = timed(run, repeat)
+            report[f"{fmt}_{dtype}"] = {
+                "ms": round(seconds * 1000, 2),
+                "bytes": len(body),
+                "texts_per_s": round(batch / seconds, 1),
+            }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=1024)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--sub-batch", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--base-url", default=None)
+    args = parser.parse_args()
+
+    if args.base_url:
+        result = {"mode": "end_to_end", "results": end_to_end(args.base_url, args.batch, args.repeat)}
+    else:
+        result = {"mode": "serialization", "results": serialization(args.batch, args.dim, args.sub_batch, args.repeat)}
+    result["batch"] = args.batch
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Exercise `LLMGateway` against the local stub under overload and failures.
+
+Fires a burst of concurrent chat calls (more than in-flight + queue) at the
+fake LLM, optionally injecting 429/5xx responses, and reports how many
+succeeded, how many were shed with a fast 503, and the latency of each.
+
+Usage (from backend/):
+    python benchmarks/bench_llm_gateway.py --calls 200 --concurrency 100 \
+        --max-in-flight 8 --max-queue 16 --fail-rate 0.2 --fail-status 429
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fastapi import HTTPException
+from fake_llm import start_server
+from llm_gateway import LLMGateway
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    samples = sorted(samples)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))], 2)
+    return {"count": len(samples), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "max_ms": round(samples[-1], 2)}
+
+
+async def run(args) -> dict:
+    stub = start_server(latency_ms=args.latency_ms, fail_rate=args.fail_rate, fail_status=args.fail_status)
+    gateway = LLMGateway(
+        api_key="stub",
+        base_url=f"http://127.0.0.1:{stub.server_address[1]}/v1",
+        max_in_flight=args.max_in_flight,
+        max_queue=args.max_queue,
+        queue_timeout=args.queue_timeout,
+        timeout=args.timeout,
+        max_retries=args.max_retries,
+        retry_base=0.05,
+        retry_max=0.5
+    )
+
+    outcomes = {}
+    clients = asyncio.Semaphore(args.concurrency)
+
+    async def call():
+        async with clients:
+            t0 = time.perf_counter()
+            try:
+                await gateway.chat(model="stub", messages=[{"role": "user", "content": "hello"}])
+                key = "ok"
+            except HTTPException as e:
+                key = f"http_{e.status_code}"
+            except Exception as e:
+                key = type(e).__name__
+            return key, (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    for key, ms in await asyncio.gather(*(call() for _ in range(args.calls))):
+        outcomes.setdefault(key, []).append(ms)
+    elapsed = time.perf_counter() - t0
+
+    await gateway.close()
+    stub.shutdown()
+
+    return {
+        "calls": args.calls,
+        "elapsed_s": round(elapsed, 3),
+        "outcomes": {key: percentiles(ms) for key, ms in outcomes.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--queue-timeout", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--fail-status", type=int, default=429)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Load test: login throughput alongside concurrent /query_docs latency.
+
+Runs against an already started API server. First measures /query_docs
+latency alone, then again while a burst of concurrent logins is in flight,
+and reports login throughput and 503 (saturation) counts.
+
+Usage (from backend/, with the API running on :8000):
+    python benchmarks/bench_login_load.py --base-url http://localhost:8000 \
+        --logins 200 --login-concurrency 50 --query-concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {}
+    samples = sorted(samples)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))], 2)
+    return {"count": len(samples), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+async def query_loop(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        r = await client.post("/query_docs", json={"query": "termination of employment notice period", "top_k": 5})
+        if r.status_code == 200:
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+
+async def measure_queries(client, concurrency: int, duration: float) -> list:
+    stop = asyncio.Event()
+    latencies = []
+    tasks = [asyncio.create_task(query_loop(client, stop, latencies)) for _ in range(concurrency)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=50)
+    parser.add_argument("--query-concurrency", type=int, default=4)
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    creds = {"email": email, "password": "bench-password"}
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        r = await client.post("/authenticate/signup", json={"full_name": "Bench", **creds})
+        r.raise_for_status()
+
+        baseline = await measure_queries(client, args.query_concurrency, args.baseline_seconds)
+
+        statuses = []
+        sem = asyncio.Semaphore(args.login_concurrency)
+
+        async def login():
+            async with sem:
+                resp = await client.post("/authenticate/login", json=creds)
+                statuses.append(resp.status_code)
+
+        stop = asyncio.Event()
+        under_load = []
+        query_tasks = [
+            asyncio.create_task(query_loop(client, stop, under_load))
+            for _ in range(args.query_concurrency)
+        ]
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        await asyncio.gather(*query_tasks)
+
+    report = {
+        "logins": {
+            "total": args.logins,
+            "ok": statuses.count(200),
+            "rejected_503": statuses.count(503),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_s": round(statuses.count(200) / elapsed, 2),
+        },
+        "query_docs_baseline": percentiles(baseline),
+        "query_docs_during_logins": percentiles(under_load),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
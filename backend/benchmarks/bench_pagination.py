@@ -0,0 +1,145 @@
+"""
+Benchmark conversation/message listing with and without keyset pagination.
+
+Seeds a SQLite database with one user owning a conversation of N messages
+(default 100k) and times:
+  - the old full load (`convo.messages`)
+  - the first keyset page
+  - a page deep into the history (following cursors)
+with the composite (conversation_id, created_at) index present and dropped.
+
+Usage (from backend/):
+    python benchmarks/bench_pagination.py --messages 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.sqlite")
+
+from sqlalchemy import text
+from database import engine, Base, SessionLocal
+from authenticate.models import User, Conversation, Message
+from conversation.pagination import newest_first_page
+
+
+def seed(n_messages: int, n_conversations: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    user = User(full_name="Bench", email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    user_id = user.id
+
+    start = datetime(2024, 1, 1)
+    convos = [
+        Conversation(user_id=user_id, title=f"c{i}", created_at=start + timedelta(minutes=i))
+        for i in range(n_conversations)
+    ]
+    db.add_all(convos)
+    db.flush()
+    target = convos[0].id
+
+    rows = [
+        {
+            "conversation_id": target,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"message {i} " + "lorem ipsum " * 10,
+            "created_at": start + timedelta(seconds=i),
+        }
+        for i in range(n_messages)
+    ]
+    db.execute(Message.__table__.insert(), rows)
+    db.commit()
+    db.close()
+    return user_id, target
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {"median_ms": round(samples[len(samples) // 2], 3), "min_ms": round(samples[0], 3)}
+
+
+def run_suite(user_id: int, convo_id: int, limit: int, depth: int, repeat: int):
+    def full_load():
+        db = SessionLocal()
+        convo = db.query(Conversation).filter(Conversation.id == convo_id).first()
+        n = len(convo.messages)
+        db.close()
+        return n
+
+    def first_page():
+        db = SessionLocal()
+        query = db.query(Message).filter(Message.conversation_id == convo_id)
+        newest_first_page(query, Message, None, limit)
+        db.close()
+
+    db = SessionLocal()
+    cursor = None
+    query = db.query(Message).filter(Message.conversation_id == convo_id)
+    for _ in range(depth):
+        _, cursor = newest_first_page(query, Message, cursor, limit)
+    db.close()
+
+    def deep_page():
+        db = SessionLocal()
+        query = db.query(Message).filter(Message.conversation_id == convo_id)
+        newest_first_page(query, Message, cursor, limit)
+        db.close()
+
+    def conversations_page():
+        db = SessionLocal()
+        query = db.query(Conversation).filter(Conversation.user_id == user_id)
+        newest_first_page(query, Conversation, None, limit)
+        db.close()
+
+    return {
+        "full_load": timed(full_load, max(1, repeat // 10)),
+        "first_page": timed(first_page, repeat),
+        f"page_{depth}": timed(deep_page, repeat),
+        "conversations_first_page": timed(conversations_page, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--conversations", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    user_id, convo_id = seed(args.messages, args.conversations)
+
+    report = {
+        "messages": args.messages,
+        "limit": args.limit,
+        "indexed": run_suite(user_id, convo_id, args.limit, args.depth, args.repeat),
+    }
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_messages_conversation_id_created_at"))
+        conn.execute(text("DROP INDEX ix_conversations_user_id_created_at"))
+    report["unindexed"] = run_suite(user_id, convo_id, args.limit, args.depth, args.repeat)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
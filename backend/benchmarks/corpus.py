@@ -0,0 +1,153 @@
+"""
+Synthetic legal corpus generator (PDF, DOCX and TXT).
+
+Text is built from a seeded vocabulary of statute/contract phrasing, with a
+share of verbatim boilerplate clauses, so runs are reproducible and the
+corpus looks like what `preload_docs.py` sees in production.
+
+Usage (from backend/):
+    python benchmarks/corpus.py --out /tmp/corpus --docs 30 --words 4000
+"""
+import argparse
+import random
+from pathlib import Path
+
+import docx
+
+SUBJECTS = [
+    "the Employer", "the Employee", "the Lessee", "the Lessor", "the Licensee",
+    "the Contractor", "the Authority", "the Company", "the Data Controller",
+    "the Tribunal", "any person", "the appropriate Government",
+]
+ACTIONS = [
+    "shall give written notice", "may terminate this agreement", "shall indemnify",
+    "shall not disclose", "shall be liable to pay compensation", "may prefer an appeal",
+    "shall maintain records", "shall comply with the provisions", "may revoke the licence",
+    "shall be entitled to", "shall furnish a statement", "may impose a penalty",
+]
+OBJECTS = [
+    "within thirty days of the receipt of such notice",
+    "in respect of any loss or damage arising therefrom",
+    "to the satisfaction of the competent authority",
+    "subject to the provisions of section {n}",
+    "notwithstanding anything contained in any other law for the time being in force",
+    "in such form and manner as may be prescribed",
+    "save as otherwise provided in this Act",
+    "unless the context otherwise requires",
+    "for a period not exceeding {n} months",
+    "upon the expiry of the term specified herein",
+]
+BOILERPLATE = [
+    "This Agreement shall be governed by and construed in accordance with the laws of India "
+    "and the courts at New Delhi shall have exclusive jurisdiction.",
+    "Nothing in this Act shall affect any right or liability acquired or incurred before the "
+    "commencement of this Act.",
+    "If any provision of this Agreement is held invalid, the remaining provisions shall "
+    "continue in full force and effect.",
+    "Words importing the singular shall include the plural and vice versa.",
+]
+
+
+def legal_text(rng: random.Random, n_words: int) -> str:
+    sentences = []
+    count = 0
+    section = 1
+    while count < n_words:
+        if rng.random() < 0.1:
+            sentence = rng.choice(BOILERPLATE)
+        else:
+            obj = rng.choice(OBJECTS).format(n=rng.randint(1, 120))
+            sentence = f"{section}. {rng.choice(SUBJECTS)} {rng.choice(ACTIONS)} {obj}."
+            section += 1
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return " ".join(sentences)
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, text: str, words_per_line: int = 12, lines_per_page: int = 50):
+    """Write `text` as a plain Helvetica PDF that PyPDF2 can extract."""
+    words = text.split()
+    lines = [" ".join(words[i:i + words_per_line]) for i in range(0, len(words), words_per_line)]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = []  # object bodies, 1-indexed by position
+    objects.append("<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(None)  # pages tree, filled in below
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for page_lines in pages:
+        body = "BT /F1 10 Tf 14 TL 40 800 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        objects.append(f"<< /Length {len(body.encode('latin-1'))} >>\nstream\n{body}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+def write_docx(path: Path, text: str, words_per_paragraph: int = 120):
+    document = docx.Document()
+    words = text.split()
+    for i in range(0, len(words), words_per_paragraph):
+        document.add_paragraph(" ".join(words[i:i + words_per_paragraph]))
+    document.save(path)
+
+
+def write_txt(path: Path, text: str):
+    path.write_text(text, encoding="utf-8")
+
+
+WRITERS = {".pdf": write_pdf, ".docx": write_docx, ".txt": write_txt}
+
+
+def generate_corpus(out_dir: Path, n_docs: int, words_per_doc: int, seed: int = 0) -> list:
+    """Write `n_docs` documents, cycling PDF/DOCX/TXT. Returns the file paths."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    suffixes = list(WRITERS)
+    paths = []
+    for i in range(n_docs):
+        suffix = suffixes[i % len(suffixes)]
+        path = out_dir / f"synthetic_{i:04d}{suffix}"
+        WRITERS[suffix](path, legal_text(rng, words_per_doc))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--words", type=int, default=4000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_corpus(Path(args.out), args.docs, args.words, args.seed)
+    print(f"✅ Wrote {len(paths)} documents to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
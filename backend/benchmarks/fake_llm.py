@@ -0,0 +1,115 @@
+"""
+Local OpenAI-compatible stub for offline benchmarks.
+
+Serves `POST /v1/chat/completions` with a canned answer after a configurable
+delay and reports token usage from whitespace word counts. A fraction of
+requests can be failed with a given status (e.g. 429 or 503) to exercise
+retry and admission behaviour. Point the API at it with
+`OPENAI_BASE_URL=http://127.0.0.1:<port>/v1`.
+
+Usage:
+    python benchmarks/fake_llm.py --port 9100 --latency-ms 300 --fail-rate 0.1 --fail-status 429
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = (
+    "Under the cited provisions, the party must give written notice within the "
+    "prescribed period, and failure to do so may result in liability for compensation."
+)
+
+
+def make_handler(latency: float, fail_rate: float = 0.0, fail_status: int = 429, retry_after: str = None):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+
+            time.sleep(latency)
+
+            if fail_rate and random.random() < fail_rate:
+                headers = {"Retry-After": retry_after} if retry_after else {}
+                self._send(fail_status, {"error": {"message": "injected failure", "type": "stub"}}, headers)
+                return
+
+            prompt_words = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+            content = ANSWER
+            if body.get("max_tokens") and body["max_tokens"] <= 10:
+                content = "Legal Query"  # title generation
+
+            self._send(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_words,
+                    "completion_tokens": len(content.split()),
+                    "total_tokens": prompt_words + len(content.split()),
+                },
+            })
+
+        def _send(self, status: int, payload: dict, headers: dict = None):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_server(
+    port: int = 0,
+    latency_ms: float = 0,
+    fail_rate: float = 0.0,
+    fail_status: int = 429,
+    retry_after: str = None
+) -> ThreadingHTTPServer:
+    """Start the stub on a background thread; `server.server_address` has the bound port."""
+    handler = make_handler(latency_ms / 1000, fail_rate, fail_status, retry_after)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--fail-status", type=int, default=429)
+    parser.add_argument("--retry-after", default=None)
+    args = parser.parse_args()
+
+    handler = make_handler(args.latency_ms / 1000, args.fail_rate, args.fail_status, args.retry_after)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"✅ Fake LLM listening on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
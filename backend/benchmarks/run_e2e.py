@@ -0,0 +1,229 @@
+"""
+Offline end-to-end benchmark: corpus -> preload -> API -> load.
+
+1. Generates a synthetic corpus (see `corpus.py`).
+2. Runs `preload_docs.py` on it and times the build.
+3. Starts the local OpenAI-compatible stub (`fake_llm.py`) and the API under
+   uvicorn against a fresh SQLite database.
+4. Drives `/query_docs`, `/ask` and `/ask_pdf` at each concurrency level and
+   reports throughput and p50/p95/p99 latency as JSON.
+
+The embedding model must already be in the local Hugging Face cache;
+`HF_HUB_OFFLINE=1` is set unless overridden.
+
+Usage (from backend/):
+    python benchmarks/run_e2e.py --docs 30 --concurrency 1,4,16 \
+        --requests 200 --output bench_e2e.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import generate_corpus, legal_text, write_pdf
+from fake_llm import start_server
+
+QUESTION = "What notice must the Employer give before termination?"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2) if ordered else None
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+    }
+
+
+def run_preload(env: dict, docs_dir: Path, store_dir: Path) -> dict:
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "preload_docs.py", "--docs-dir", str(docs_dir), "--vectorstore-path", str(store_dir)],
+        cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL
+    )
+    elapsed = time.perf_counter() - t0
+    with open(store_dir / "metadata.pkl", "rb") as f:
+        vectors = len(pickle.load(f))
+    return {"seconds": round(elapsed, 3), "vectors": vectors}
+
+
+def wait_for_api(base_url: str, proc: subprocess.Popen, timeout: float = 180):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(base_url + "/", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("API server did not become ready")
+
+
+async def drive(client: httpx.AsyncClient, make_request, concurrency: int, total: int) -> dict:
+    """Issue `total` requests with `concurrency` workers; worker index is passed to `make_request`."""
+    latencies, errors = [], 0
+    remaining = total
+
+    async def worker(index: int):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            t0 = time.perf_counter()
+            try:
+                r = await make_request(client, index)
+                ok = r.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - t0) * 1000)
+            else:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - t0)
+
+
+async def run_load(base_url: str, endpoints: list, levels: list, total: int, pdf_bytes: bytes) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        creds = {"email": "bench@example.com", "password": "bench-password"}
+        await client.post("/authenticate/signup", json={"full_name": "Bench", **creds})
+        login = (await client.post("/authenticate/login", json=creds)).json()
+        headers = {"Authorization": f"Bearer {login['access_token']}"}
+
+        # One conversation per worker so history grows the way it would for real users
+        conversations = []
+        for _ in range(max(levels)):
+            r = await client.post("/conversations/", json={"title": "Bench"}, headers=headers)
+            conversations.append(r.json()["id"])
+
+        requests = {
+            "query_docs": lambda c, i: c.post("/query_docs", json={"query": QUESTION, "top_k": 5}),
+            "ask": lambda c, i: c.post(f"/ask/{conversations[i]}", json={"prompt": QUESTION}),
+            "ask_pdf": lambda c, i: c.post(
+                f"/ask_pdf/{conversations[i]}",
+                data={"question": QUESTION, "top_k": "5"},
+                files={"file": ("upload.pdf", pdf_bytes, "application/pdf")}
+            ),
+        }
+
+        results = {}
+        for name in endpoints:
+            results[name] = {}
+            for level in levels:
+                results[name][str(level)] = await drive(client, requests[name], level, total)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--words", type=int, default=4000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint per concurrency level")
+    parser.add_argument("--endpoints", default="query_docs,ask,ask_pdf")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--pdf-words", type=int, default=3000, help="size of the PDF uploaded to /ask_pdf")
+    parser.add_argument("--workdir", default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="rag-bench-"))
+    docs_dir, store_dir = workdir / "docs", workdir / "vectorstore"
+
+    t0 = time.perf_counter()
+    generate_corpus(docs_dir, args.docs, args.words, args.seed)
+    corpus_seconds = time.perf_counter() - t0
+
+    upload = workdir / "upload.pdf"
+    write_pdf(upload, legal_text(random.Random(args.seed + 1), args.pdf_words))
+
+    llm = start_server(latency_ms=args.llm_latency_ms)
+    llm_port = llm.server_address[1]
+
+    env = dict(os.environ)
+    env.setdefault("HF_HUB_OFFLINE", "1")
+    env.update({
+        "DATABASE_URL": f"sqlite:///{workdir / 'bench.sqlite'}",
+        "VECTORSTORE_PATH": str(store_dir),
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "OPENAI_API_KEY": "stub",
+        "JWT_SECRET": env.get("JWT_SECRET", "bench-secret"),
+    })
+
+    preload = run_preload(env, docs_dir, store_dir)
+
+    api_port = free_port()
+    base_url = f"http://127.0.0.1:{api_port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(api_port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        wait_for_api(base_url, server)
+        levels = [int(x) for x in args.concurrency.split(",")]
+        endpoints = [e for e in args.endpoints.split(",") if e]
+        results = asyncio.run(run_load(base_url, endpoints, levels, args.requests, upload.read_bytes()))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        llm.shutdown()
+
+    report = {
+        "commit": git_commit(),
+        "config": {
+            "docs": args.docs,
+            "words_per_doc": args.words,
+            "seed": args.seed,
+            "requests_per_level": args.requests,
+            "llm_latency_ms": args.llm_latency_ms,
+            "pdf_words": args.pdf_words,
+        },
+        "corpus_seconds": round(corpus_seconds, 3),
+        "preload": preload,
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import os
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from authenticate.models import Message
+from tracing import record_cache, DROPPED_MESSAGES
+
+MAX_HISTORY = 10  # last N messages kept per conversation
+HISTORY_CACHE_CONVERSATIONS = int(os.getenv("HISTORY_CACHE_CONVERSATIONS", "1000"))
+HISTORY_LOCK_STRIPES = 64
+MESSAGE_BATCH_SIZE = int(os.getenv("MESSAGE_BATCH_SIZE", "100"))
+MESSAGE_FLUSH_INTERVAL_SECONDS = float(os.getenv("MESSAGE_FLUSH_INTERVAL_SECONDS", "0.05"))
+MESSAGE_MAX_PENDING = int(os.getenv("MESSAGE_MAX_PENDING", "10000"))
+MESSAGE_MAX_ATTEMPTS = int(os.getenv("MESSAGE_MAX_ATTEMPTS", "8"))
+MESSAGE_RETRY_MAX_SECONDS = float(os.getenv("MESSAGE_RETRY_MAX_SECONDS", "10"))
+MESSAGE_SYNC_TIMEOUT_SECONDS = float(os.getenv("MESSAGE_SYNC_TIMEOUT_SECONDS", "1"))
+
+
+class MessageWriter:
+    """
+    Buffers chat messages and inserts them in batches from a background thread.
+
+    Rows are flushed when `batch_size` is reached or every `flush_interval`
+    seconds, whichever comes first. `created_at` is stamped at enqueue time so
+    ordering matches the order turns happened, not the order they were flushed.
+
+    A failed batch is retried row by row. If some rows go in, the ones that
+    still fail are bad data and are dropped. If none do (the DB is down), the
+    rows stay queued and the writer backs off; after `max_attempts` failed
+    flushes they are dropped. Drops are logged and counted in
+    `rag_dropped_messages_total`. Once `max_pending` rows are queued, new
+    messages are refused with a 503 instead of growing memory.
+
+    Only the background thread writes (and counts attempts). Request handlers
+    either `sync()` - wait for the thread's next flush, without retrying - or
+    read rows that are still queued from memory with `queued()`.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = MESSAGE_BATCH_SIZE,
+        flush_interval: float = MESSAGE_FLUSH_INTERVAL_SECONDS,
+        max_pending: int = MESSAGE_MAX_PENDING,
+        max_attempts: int = MESSAGE_MAX_ATTEMPTS,
+        retry_max: float = MESSAGE_RETRY_MAX_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_max = retry_max
+        self._pending = []  # (row, failed_attempts)
+        self._inflight = []  # batch being written by the current flush
+        self._retry_delay = 0.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._flushes_started = 0
+        self._flushes_done = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="message-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def enqueue(self, conversation_id: int, role: str, content: str):
+        row = {
+            "conversation_id": conversation_id,
+            "role": role,
+            "content": content,
+            "created_at": datetime.utcnow()
+        }
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Message storage is unavailable, please retry shortly",
+                    headers={"Retry-After": "5"}
+                )
+            self._pending.append((row, 0))
+            full = len(self._pending) >= self.batch_size
+        if self._thread is None:
+            # No background writer running (e.g. scripts): write through
+            self.flush()
+        elif full and not self._retry_delay:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending) + len(self._inflight)
+
+    def queued(self, conversation_id: int) -> list:
+        """Rows of a conversation not yet known to be written, oldest first.
+
+        A row may already be committed while its flush is finishing, so callers
+        reading the DB afterwards must de-duplicate (see `HistoryCache.recent`).
+        """
+        with self._lock:
+            return [
+                row for row, _ in self._inflight + self._pending
+                if row["conversation_id"] == conversation_id
+            ]
+
+    def sync(self, timeout: float = MESSAGE_SYNC_TIMEOUT_SECONDS) -> bool:
+        """
+        Wait up to `timeout` seconds for the rows queued so far to be flushed.
+
+        Never writes on the caller's thread. Returns False straight away while
+        the writer is backing off after a failed flush, and on timeout.
+        """
+        with self._lock:
+            if self._thread is None or not (self._pending or self._inflight):
+                return not (self._pending or self._inflight)
+            if self._retry_delay:
+                return False
+            # Queued rows go out with the next flush to start, in-flight ones with the current one
+            target = self._flushes_started + (1 if self._pending else 0)
+            self._wakeup.set()
+            done = self._flushed.wait_for(lambda: self._flushes_done >= target, timeout)
+            return done and not self._retry_delay
+
+    def flush(self) -> bool:
+        """Write everything queued; returns False if rows had to be re-queued."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._inflight = batch
+                self._flushes_started += 1
+            retry = []
+            try:
+                return self._write(batch, retry)
+            finally:
+                with self._lock:
+                    self._pending[:0] = retry
+                    self._inflight = []
+                    self._flushes_done += 1
+                    self._flushed.notify_all()
+
+    def _write(self, batch: list, retry: list) -> bool:
+        if not batch:
+            return True
+
+        try:
+            self._insert([row for row, _ in batch])
+            self._retry_delay = 0.0
+            return True
+        except Exception as e:
+            print(f"⚠️ Message batch insert failed, retrying row by row: {e}")
+
+        failed = []
+        for row, attempts in batch:
+            try:
+                self._insert([row])
+            except Exception as e:
+                failed.append((row, attempts + 1, e))
+
+        if not failed:
+            self._retry_delay = 0.0
+            return True
+
+        if len(failed) < len(batch):
+            # Others went in, so these rows themselves are bad: drop them
+            self._drop(failed, "rejected by the database")
+            self._retry_delay = 0.0
+            return True
+
+        # Nothing went in: treat as a DB outage, keep the rows and back off
+        retry.extend((row, attempts) for row, attempts, _ in failed if attempts < self.max_attempts)
+        self._drop([f for f in failed if f[1] >= self.max_attempts], "retries exhausted")
+        self._retry_delay = min(self.retry_max, max(1.0, self._retry_delay * 2))
+        return False
+
+    def _insert(self, rows: list):
+        db = self.session_factory()
+        try:
+            db.execute(Message.__table__.insert(), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _drop(self, failed: list, reason: str):
+        for row, _, error in failed:
+            DROPPED_MESSAGES.inc()
+            print(
+                f"❌ Dropped message for conversation {row['conversation_id']} "
+                f"({row['role']}, {reason}): {error}"
+            )
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if self._retry_delay:
+                # Backing off after a failed flush: wake-ups don't cut it short
+                self._stopped.wait(self._retry_delay)
+            else:
+                self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+class HistoryCache:
+    """
+    In-process ring buffers of the last `max_history` messages per conversation.
+
+    Populated from the DB on first access and appended to on every write, so
+    hot conversations build prompts without a history query. Bounded LRU over
+    conversations. Each worker process has its own cache, so a conversation
+    should be served by one worker (sticky routing) when running several.
+
+    Loads, appends and invalidations of a conversation run under the same
+    (striped) per-conversation lock, so a turn written while the history is
+    being read from the DB can't be missed by the buffer that read creates.
+    """
+
+    def __init__(
+        self,
+        writer: MessageWriter,
+        max_history: int = MAX_HISTORY,
+        max_conversations: int = HISTORY_CACHE_CONVERSATIONS
+    ):
+        self.writer = writer
+        self.max_history = max_history
+        self.max_conversations = max_conversations
+        self._buffers = OrderedDict()  # conversation_id -> deque[(role, content)]
+        self._lock = threading.Lock()
+        self._conversation_locks = [threading.Lock() for _ in range(HISTORY_LOCK_STRIPES)]
+        self.hits = 0
+        self.misses = 0
+
+    def _conversation_lock(self, conversation_id: int) -> threading.Lock:
+        return self._conversation_locks[conversation_id % len(self._conversation_locks)]
+
+    def _cached(self, conversation_id: int):
+        with self._lock:
+            buffer = self._buffers.get(conversation_id)
+            if buffer is not None:
+                self._buffers.move_to_end(conversation_id)
+                return list(buffer)
+            return None
+
+    def recent(self, db: Session, conversation_id: int) -> list:
+        """Return up to `max_history` (role, content) pairs, oldest first."""
+        cached = self._cached(conversation_id)
+        if cached is not None:
+            self.hits += 1
+            record_cache("history", True)
+            return cached
+
+        with self._conversation_lock(conversation_id):
+            # Another request may have loaded it while we waited for the lock
+            cached = self._cached(conversation_id)
+            if cached is not None:
+                self.hits += 1
+                record_cache("history", True)
+                return cached
+            self.misses += 1
+            record_cache("history", False)
+
+            # Rows for this conversation may still be queued from before eviction.
+            # Take them before querying: a row committed in between then shows
+            # up in both and is de-duplicated, instead of in neither.
+            queued = self.writer.queued(conversation_id)
+
+            messages = (
+                db.query(Message.role, Message.content, Message.created_at)
+                .filter(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at.desc(), Message.id.desc())
+                .limit(self.max_history)
+                .all()
+            )
+            history = [(m.created_at, m.role, m.content) for m in reversed(messages)]
+            written = set(history)
+            history += [
+                key for key in ((r["created_at"], r["role"], r["content"]) for r in queued)
+                if key not in written
+            ]
+            history.sort(key=lambda m: m[0])  # stable: DB order kept on ties
+            buffer = deque(((role, content) for _, role, content in history), maxlen=self.max_history)
+
+            with self._lock:
+                self._buffers[conversation_id] = buffer
+                self._evict()
+                return list(buffer)
+
+    def append(self, conversation_id: int, role: str, content: str):
+        """Queue a message for batched insert and update the cached history."""
+        with self._conversation_lock(conversation_id):
+            self.writer.enqueue(conversation_id, role, content)
+            with self._lock:
+                buffer = self._buffers.get(conversation_id)
+                if buffer is not None:
+                    buffer.append((role, content))
+
+    def invalidate(self, conversation_id: int):
+        """Drop the cached history, e.g. after a message was written outside `append`."""
+        with self._conversation_lock(conversation_id):
+            with self._lock:
+                self._buffers.pop(conversation_id, None)
+
+    def _evict(self):
+        while len(self._buffers) > self.max_conversations:
+            self._buffers.popitem(last=False)
+
+
+message_writer = MessageWriter()
+history_cache = HistoryCache(message_writer)
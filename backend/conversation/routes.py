@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 from conversation.schemas import MessageCreate, MessageOut
 from database import SessionLocal
@@ -10,6 +10,13 @@ from conversation.schemas import (
     ConversationWithMessages
 )
 from authenticate.dependencies import get_db, get_current_user_id
+from conversation.history import history_cache, message_writer
+from conversation.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    newest_first_page
+)
 
 router = APIRouter(
     prefix="/conversations",
@@ -40,15 +47,27 @@ def create_conversation(
 # -------------------------
 @router.get("/", response_model=List[ConversationOut])
 def list_conversations(
+    response: Response,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
-    return (
-        db.query(Conversation)
-        .filter(Conversation.user_id == user_id)
-        .order_by(Conversation.created_at.desc())
-        .all()
-    )
+    """
+    Newest first. Without `cursor` or `limit` every conversation is returned,
+    as before; otherwise one page, with the next page's cursor in `X-Next-Cursor`.
+    """
+    query = db.query(Conversation).filter(Conversation.user_id == user_id)
+
+    if cursor is None and limit is None:
+        return query.order_by(Conversation.created_at.desc(), Conversation.id.desc()).all()
+
+    convos, next_cursor = newest_first_page(query, Conversation, cursor, limit or DEFAULT_PAGE_SIZE)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return convos
 
 
 # -------------------------
@@ -60,8 +79,11 @@ def get_conversation(
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
+    message_writer.sync()  # let queued messages land; doesn't wait out a DB outage
+
     convo = (
         db.query(Conversation)
+        .options(selectinload(Conversation.messages))
         .filter(
             Conversation.id == conversation_id,
             Conversation.user_id == user_id
@@ -98,21 +120,42 @@ def add_message(
     db.add(message)
     db.commit()
     db.refresh(message)
+    history_cache.invalidate(conversation_id)
 
     return message
 
 @router.get("/{conversation_id}/messages", response_model=List[MessageOut])
 def get_messages(
     conversation_id: int,
+    response: Response,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
-    convo = db.query(Conversation).filter(
+    """
+    Messages in chronological order. Without `cursor` or `limit` all of them
+    are returned, as before; otherwise the latest `limit`, and `X-Next-Cursor`,
+    when present, fetches the page of older messages before this one.
+    """
+    convo_exists = db.query(Conversation.id).filter(
         Conversation.id == conversation_id,
         Conversation.user_id == user_id
     ).first()
 
-    if not convo:
+    if not convo_exists:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    return convo.messages
+    message_writer.sync()  # let queued messages land; doesn't wait out a DB outage
+
+    query = db.query(Message).filter(Message.conversation_id == conversation_id)
+
+    if cursor is None and limit is None:
+        return query.order_by(Message.created_at, Message.id).all()
+
+    messages, next_cursor = newest_first_page(query, Message, cursor, limit or DEFAULT_PAGE_SIZE)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return list(reversed(messages))
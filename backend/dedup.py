@@ -0,0 +1,94 @@
+import os
+import zlib
+from collections import defaultdict
+import numpy as np
+
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: candidate pairs start around ~0.7 Jaccard
+SHINGLE_SIZE = 5
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Lower-cased word `size`-grams; short texts become a single shingle."""
+    words = text.lower().split()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH index for spotting near-duplicate chunks before embedding.
+
+    `find_or_add` returns the id of an already indexed chunk whose estimated
+    Jaccard similarity (over word shingles) is at least `threshold`, or
+    registers the text as a new canonical chunk and returns None.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEDUP_THRESHOLD,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # Multiply-shift hashing: ((a * x + b) mod 2^64) >> 32 with odd `a`
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+        self._buckets = [defaultdict(list) for _ in range(bands)]
+        self._signatures = {}  # id -> signature
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode()) for s in shingles(text)),
+            dtype=np.uint64
+        )
+        # (n_shingles, num_perm) hashes, min over shingles; uint64 wraps on overflow
+        permuted = (hashes[:, None] * self._a + self._b) >> np.uint64(32)
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find(self, signature: np.ndarray):
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best_id, best_sim = None, self.threshold
+        for cid in candidates:
+            sim = float(np.mean(self._signatures[cid] == signature))
+            if sim >= best_sim:
+                best_id, best_sim = cid, sim
+        return best_id
+
+    def add(self, chunk_id, signature: np.ndarray):
+        self._signatures[chunk_id] = signature
+        for band, key in self._band_keys(signature):
+            self._buckets[band][key].append(chunk_id)
+
+    def find_or_add(self, chunk_id, text: str):
+        signature = self.signature(text)
+        duplicate_of = self.find(signature)
+        if duplicate_of is None:
+            self.add(chunk_id, signature)
+        return duplicate_of
+
+
+def unique_chunks(chunks: list, threshold: float = DEDUP_THRESHOLD) -> list:
+    """Drop near-duplicates from `chunks`, keeping the first occurrence and order."""
+    index = NearDuplicateIndex(threshold=threshold)
+    return [chunk for i, chunk in enumerate(chunks) if index.find_or_add(i, chunk) is None]
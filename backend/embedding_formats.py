@@ -0,0 +1,93 @@
+import base64
+import json
+import os
+import numpy as np
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "2048"))
+# Streaming holds only one sub-batch in memory, so it may take far larger inputs
+EMBED_MAX_STREAM_BATCH = int(os.getenv("EMBED_MAX_STREAM_BATCH", "50000"))
+
+FORMATS = ("json", "base64", "binary", "ndjson")
+DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+# Accept header media types -> format, checked when no explicit ?format= is given
+ACCEPT_FORMATS = {
+    "application/octet-stream": "binary",
+    "application/x-ndjson": "ndjson",
+    "application/x-embedding-base64": "base64",
+}
+
+
+def negotiate(format: str | None, dtype: str, accept: str | None) -> tuple[str, str]:
+    """Resolve the response format from `?format=` or the Accept header (default json)."""
+    if dtype not in DTYPES:
+        raise HTTPException(status_code=400, detail=f"dtype must be one of {list(DTYPES)}")
+
+    if format is None:
+        format = "json"
+        for media_type in (accept or "").split(","):
+            media_type = media_type.split(";")[0].strip().lower()
+            if media_type in ACCEPT_FORMATS:
+                format = ACCEPT_FORMATS[media_type]
+                break
+
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(FORMATS)}")
+    return format, dtype
+
+
+def check_batch_size(texts: list, format: str):
+    limit = EMBED_MAX_STREAM_BATCH if format == "ndjson" else EMBED_MAX_BATCH
+    if len(texts) > limit:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {limit} texts per {format} request; split the batch or use format=ndjson"
+        )
+
+
+def encode_embeddings(embeddings: np.ndarray, format: str, dtype: str, key: str) -> Response:
+    """
+    Serialize a (n, dim) or (dim,) array.
+
+    - json:   `{key: [...]}` floats (as before)
+    - base64: `{"dtype", "shape", "data"}` with little-endian bytes base64-encoded
+    - binary: raw little-endian bytes; shape/dtype in X-Embedding-Shape/X-Embedding-Dtype
+
+    `dtype` applies to the base64 and binary formats.
+    """
+    if format == "json":
+        # Bypass jsonable_encoder: walking every float dominates large batches
+        return JSONResponse({key: embeddings.tolist()})
+
+    raw = np.ascontiguousarray(embeddings, dtype=DTYPES[dtype]).tobytes()
+    shape = list(embeddings.shape)
+
+    if format == "base64":
+        return JSONResponse({
+            "dtype": dtype,
+            "shape": shape,
+            "data": base64.b64encode(raw).decode("ascii")
+        })
+
+    return Response(
+        content=raw,
+        media_type="application/octet-stream",
+        headers={
+            "X-Embedding-Shape": ",".join(str(d) for d in shape),
+            "X-Embedding-Dtype": dtype
+        }
+    )
+
+
+def ndjson_lines(batches):
+    """One JSON line per text, `{"index": i, "embedding": [...]}`, from `(offset, array)` sub-batches."""
+    for offset, embeddings in batches:
+        for i, row in enumerate(embeddings.tolist()):
+            yield json.dumps({"index": offset + i, "embedding": row}) + "\n"
+
+
+def ndjson_stream(batches) -> StreamingResponse:
+    """Stream `ndjson_lines`, so each sub-batch is sent as soon as it is encoded."""
+    return StreamingResponse(ndjson_lines(batches), media_type="application/x-ndjson")
@@ -1,12 +1,35 @@
+import os
+import numpy as np
 from sentence_transformers import SentenceTransformer
+from tracing import span, EMBEDDED_TEXTS
 
 model_name = "all-MiniLM-L6-v2"
 model = SentenceTransformer(model_name)
 
+# Largest slice of a request handed to the model in one encode call
+EMBED_SUB_BATCH = int(os.getenv("EMBED_SUB_BATCH", "64"))
+
 def embed_text(text: str) -> list:
-    embedding = model.encode(text, convert_to_tensor=False)
+    with span("embed"):
+        embedding = model.encode(text, convert_to_tensor=False)
+    EMBEDDED_TEXTS.inc()
     return embedding.tolist()
 
 def embed_texts(texts: list) -> list:
-    embeddings = model.encode(texts, convert_to_tensor=False)
-    return [e.tolist() for e in embeddings]
\ No newline at end of file
+    return embed_array(texts).tolist()
+
+def iter_embedding_batches(texts: list, batch_size: int = EMBED_SUB_BATCH):
+    """Yield `(offset, float32 array)` per sub-batch so large inputs are encoded in slices."""
+    for offset in range(0, len(texts), batch_size):
+        batch = texts[offset:offset + batch_size]
+        with span("embed"):
+            embeddings = model.encode(batch, convert_to_tensor=False)
+        EMBEDDED_TEXTS.inc(len(batch))
+        yield offset, np.asarray(embeddings, dtype="float32")
+
+def embed_array(texts: list, batch_size: int = EMBED_SUB_BATCH) -> np.ndarray:
+    """Encode `texts` into one (n, dim) float32 array, sub-batch by sub-batch."""
+    batches = [embeddings for _, embeddings in iter_embedding_batches(texts, batch_size)]
+    if not batches:
+        return np.empty((0, model.get_sentence_embedding_dimension()), dtype="float32")
+    return np.concatenate(batches)
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import random
+from contextlib import asynccontextmanager
+import httpx
+from fastapi import HTTPException, status
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError
+from tracing import LLM_EVENTS
+
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "16"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "64"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "5"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "8"))
+
+
+def _busy(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": "1"}
+    )
+
+
+class LLMGateway:
+    """
+    Bounded, retrying front door to the OpenAI chat API.
+
+    Async end to end: calls waiting for a slot or sleeping between retries
+    hold no thread, so they can't exhaust the threadpool that sync handlers
+    and `run_in_threadpool` share. Use it from one event loop.
+
+    - At most `max_in_flight` calls run at once; up to `max_queue` more wait
+      for a slot for at most `queue_timeout` seconds. Anything beyond that
+      gets an immediate 503 instead of piling up latency.
+    - 429, 5xx, connection errors and timeouts are retried up to
+      `max_retries` times with full-jitter exponential backoff, honouring
+      the provider's Retry-After when it sends one.
+    - One pooled HTTP client is reused for every call, sized to the
+      in-flight limit.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        max_in_flight: int = LLM_MAX_IN_FLIGHT,
+        max_queue: int = LLM_MAX_QUEUE,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT_SECONDS,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        connect_timeout: float = LLM_CONNECT_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+        retry_base: float = LLM_RETRY_BASE_SECONDS,
+        retry_max: float = LLM_RETRY_MAX_SECONDS
+    ):
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+
+        request_timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_in_flight,
+                max_keepalive_connections=max_in_flight,
+                keepalive_expiry=30
+            ),
+            timeout=request_timeout
+        )
+        # Retries are ours (jittered, bounded by the gateway), not the SDK's
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self._http,
+            timeout=request_timeout,
+            max_retries=0
+        )
+
+        self._slots = asyncio.BoundedSemaphore(max_in_flight)
+        self._waiting = 0
+
+    @asynccontextmanager
+    async def _admit(self):
+        if self._slots.locked():
+            if self._waiting >= self.max_queue:
+                LLM_EVENTS.labels(event="rejected").inc()
+                raise _busy("Model is busy, please retry shortly")
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                LLM_EVENTS.labels(event="queue_timeout").inc()
+                raise _busy("Model is busy, please retry shortly")
+            finally:
+                self._waiting -= 1
+        else:
+            await self._slots.acquire()
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(self.retry_max, self.retry_base * (2 ** attempt)))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return min(delay, self.retry_max)
+
+    @staticmethod
+    def _retryable(error: Exception) -> bool:
+        if isinstance(error, APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, (APIConnectionError, APITimeoutError))
+
+    @staticmethod
+    def _to_http_error(error: Exception) -> HTTPException:
+        if isinstance(error, APITimeoutError):
+            return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Model request timed out")
+        if isinstance(error, APIStatusError) and error.status_code == 429:
+            return _busy("Model is rate limited, please retry shortly")
+        return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Model provider error")
+
+    async def chat(self, **kwargs):
+        """`await client.chat.completions.create(**kwargs)` behind admission control and retries."""
+        async with self._admit():
+            attempt = 0
+            while True:
+                try:
+                    return await self.client.chat.completions.create(**kwargs)
+                except Exception as e:
+                    if not self._retryable(e):
+                        raise
+                    if attempt >= self.max_retries:
+                        LLM_EVENTS.labels(event="failed").inc()
+                        raise self._to_http_error(e)
+                    LLM_EVENTS.labels(event="retry").inc()
+                    await asyncio.sleep(self._backoff(attempt, e))
+                    attempt += 1
+
+    async def close(self):
+        await self._http.aclose()
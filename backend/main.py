@@ -1,24 +1,42 @@
 import os, uvicorn, uuid
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Request, Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from openai import OpenAI
-from embeddings import embed_text, embed_texts
+from embeddings import embed_text, embed_texts, embed_array, iter_embedding_batches
+from embedding_formats import negotiate, check_batch_size, encode_embeddings, ndjson_stream
 from utils import chunk_text
+from dedup import unique_chunks
 from vectorstore import VectorStore
 from pathlib import Path
 from PyPDF2 import PdfReader
 from tempfile import TemporaryDirectory
 from authenticate.models import User
-from authenticate.auth import hash_password, create_access_token
+from authenticate.auth import create_access_token
+from authenticate.hashing import password_pool
 from authenticate.dependencies import get_db
 from sqlalchemy.orm import Session
-from authenticate.auth import verify_password
 from authenticate.schemas import SignupRequest, LoginRequest
 from database import engine, Base
 from authenticate.models import User, Conversation
 from conversation.routes import router as conversation_router
+from llm_gateway import LLMGateway
+from conversation.history import MAX_HISTORY, history_cache, message_writer
+from tracing import (
+    span,
+    start_trace,
+    server_timing,
+    SamplingProfiler,
+    PROFILE_HEADER,
+    PROFILING_ENABLED,
+    LLM_TOKENS,
+    CHUNKS,
+    DUPLICATE_CHUNKS,
+    INDEX_VECTORS,
+    INDEX_BYTES
+)
 from authenticate.models import Message, Conversation
 
 # ------------------------------
@@ -32,12 +50,34 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-Profile-File"]
 )
 
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    trace = start_trace()
+
+    # Opt-in per request; only honoured when PROFILING_ENABLED=true
+    profiler = None
+    if PROFILING_ENABLED and request.headers.get(PROFILE_HEADER) == "1":
+        profiler = SamplingProfiler(trace)
+        profiler.start()
+
+    try:
+        response = await call_next(request)
+    finally:
+        profile_path = profiler.stop() if profiler else None
+
+    if trace.spans:
+        response.headers["Server-Timing"] = server_timing(trace)
+    if profile_path:
+        response.headers["X-Profile-File"] = profile_path.name
+    return response
+
 app.include_router(conversation_router)
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+llm = LLMGateway(api_key=os.getenv("OPENAI_API_KEY"))
 
 # Persistent FAISS for preloaded legal corpus
 VECTORSTORE_PATH = Path(
@@ -61,28 +101,40 @@ class TextsRequest(BaseModel):
 class QueryRequest(BaseModel):
     query: str
     top_k: int = 5
+    min_similarity: float | None = None
 
 # ------------------------------
 # Utility Functions
 # ------------------------------
 def extract_pdf_text(file) -> str:
-    reader = PdfReader(file)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
+    with span("pdf_extract"):
+        reader = PdfReader(file)
+        text = ""
+        for page in reader.pages:
+            text += page.extract_text() + "\n"
     return text
 
-def ask_model(prompt: str) -> str:
+def record_token_usage(response):
+    usage = getattr(response, "usage", None)
+    if usage:
+        LLM_TOKENS.labels(kind="prompt").inc(usage.prompt_tokens or 0)
+        LLM_TOKENS.labels(kind="completion").inc(usage.completion_tokens or 0)
+
+async def ask_model(prompt: str) -> str:
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a legal assistant. Answer only using the provided context."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2
-        )
+        with span("llm"):
+            response = await llm.chat(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are a legal assistant. Answer only using the provided context."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.2
+            )
+        record_token_usage(response)
         return response.choices[0].message.content.strip()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -91,18 +143,12 @@ def build_prompt_with_history(
             user_question: str,
             db: Session,
             pdf_context: str = "",
-            max_history: int = 10
+            max_history: int = MAX_HISTORY
         ) -> str:
-            # Fetch last N messages
-            messages = (
-                db.query(Message)
-                .filter(Message.conversation_id == conversation_id)
-                .order_by(Message.created_at.desc())
-                .limit(max_history)
-                .all()
-            )
-            messages = reversed(messages)  # oldest first
-            chat_history = "\n".join([f"{m.role}: {m.content}" for m in messages])
+            # Last N messages, oldest first (served from the history cache when hot)
+            with span("history"):
+                messages = history_cache.recent(db, conversation_id)[-max_history:]
+            chat_history = "\n".join([f"{role}: {content}" for role, content in messages])
 
             # Combine chat history and PDF/global RAG context
             combined_context = "\n\n".join(filter(None, [chat_history, pdf_context]))
@@ -123,27 +169,29 @@ def build_prompt_with_history(
         """
             return prompt
 
-def generate_ai_conversation_title(first_message: str) -> str:
+async def generate_ai_conversation_title(first_message: str) -> str:
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "Generate a short, clear conversation title "
-                        "from the user's message. "
-                        "Max 2 words. No punctuation. No quotes."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": first_message
-                }
-            ],
-            temperature=0.3,
-            max_tokens=10
-        )
+        with span("llm_title"):
+            response = await llm.chat(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": (
+                            "Generate a short, clear conversation title "
+                            "from the user's message. "
+                            "Max 2 words. No punctuation. No quotes."
+                        )
+                    },
+                    {
+                        "role": "user",
+                        "content": first_message
+                    }
+                ],
+                temperature=0.3,
+                max_tokens=10
+            )
+        record_token_usage(response)
 
         title = response.choices[0].message.content.strip()
 
@@ -162,9 +210,34 @@ def generate_ai_conversation_title(first_message: str) -> str:
             return words[0].capitalize()
         return "Conversation"
 
+@app.on_event("startup")
+def start_password_pool():
+    password_pool.start()
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    password_pool.shutdown()
+
+@app.on_event("shutdown")
+async def close_llm_gateway():
+    await llm.close()
+
+@app.on_event("startup")
+def start_message_writer():
+    message_writer.start()
+
+@app.on_event("shutdown")
+def stop_message_writer():
+    # Flushes any queued messages before exit
+    message_writer.stop()
+
 @app.on_event("startup")
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all skips indexes of tables that already exist: add the
+    # pagination indexes to databases created before they were introduced
+    for index in (*Message.__table__.indexes, *Conversation.__table__.indexes):
+        index.create(bind=engine, checkfirst=True)
 
 # ------------------------------
 # Startup Event
@@ -185,106 +258,172 @@ def startup_load():
 def root():
     return {"message": "Legal & Policy Assistant API is running!"}
 
+@app.get("/metrics")
+def metrics():
+    if vectorstore is not None:
+        INDEX_VECTORS.set(vectorstore.index.ntotal)
+        INDEX_BYTES.set(vectorstore.memory_bytes())
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# Auth handlers are async so requests waiting on the bcrypt pool don't hold
+# threadpool slots; their DB work is pushed to the threadpool explicitly.
 @app.post("/authenticate/signup")
-def signup(data: SignupRequest, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == data.email).first()
+async def signup(data: SignupRequest, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(
+        lambda: db.query(User.id).filter(User.email == data.email).first()
+    )
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user = User(
         full_name=data.full_name,
         email=data.email,
-        password_hash=hash_password(data.password)
+        password_hash=await password_pool.hash(data.password)
     )
 
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    def save_user():
+        db.add(user)
+        db.commit()
+
+    await run_in_threadpool(save_user)
 
     return {"message": "User created successfully"}
 
 @app.post("/authenticate/login")
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
-    if not user or not verify_password(data.password, user.password_hash):
+async def login(data: LoginRequest, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == data.email).first()
+    )
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token(user.email)
+    valid, new_hash = await password_pool.verify_and_update(data.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    # ✅ Always create a new conversation on login
-    new_convo = Conversation(
-        user_id=user.id,
-        title="New Conversation"
-    )
-    db.add(new_convo)
-    db.commit()
-    db.refresh(new_convo)
+    def start_session():
+        # ✅ Stored hash used an old bcrypt cost: upgrade it with this commit
+        if new_hash:
+            user.password_hash = new_hash
+
+        # ✅ Always create a new conversation on login
+        new_convo = Conversation(
+            user_id=user.id,
+            title="New Conversation"
+        )
+        db.add(new_convo)
+        db.commit()
+        db.refresh(new_convo)
+        db.refresh(user)
+        return user.id, user.email, user.full_name, new_convo.id
+
+    user_id, email, full_name, convo_id = await run_in_threadpool(start_session)
+    token = create_access_token({"sub": email, "uid": user_id})
 
     return {
         "access_token": token,
         "token_type": "bearer",
-        "full_name": user.full_name,
-        "new_conversation_id": new_convo.id  # Optional: frontend can highlight it
+        "full_name": full_name,
+        "new_conversation_id": convo_id  # Optional: frontend can highlight it
     }
 
 
-MAX_HISTORY = 10  # last N messages
-
+def load_conversation(db: Session, conversation_id: int):
+    convo = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+    # Don't hold a pooled DB connection while a title is generated; `convo`
+    # stays usable detached and `save_title` re-attaches it
+    db.close()
+    return convo
+
+def save_title(db: Session, convo: Conversation, title: str):
+    db.add(convo)
+    convo.title = title
+    with span("db_commit"):
+        db.commit()
+
+def save_turn(conversation_id: int, question: str, answer: str):
+    # Queued for a batched insert; the history cache sees them immediately
+    with span("db_persist"):
+        history_cache.append(conversation_id, "user", question)
+        history_cache.append(conversation_id, "assistant", answer)
+
+# Like the auth handlers, the model-backed handlers are async: requests queued
+# in the LLM gateway or sleeping between retries don't hold threadpool slots.
+# DB, embedding and FAISS work is pushed to the threadpool explicitly.
 @app.post("/ask/{conversation_id}")
-def ask_with_history(
+async def ask_with_history(
     conversation_id: int,
     prompt_request: PromptRequest,
     db: Session = Depends(get_db)
 ):
-    convo = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+    convo = await run_in_threadpool(load_conversation, db, conversation_id)
     if not convo:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # ✅ Generate AI title ONLY for first message
     if convo.title == "New Conversation":
-        convo.title = generate_ai_conversation_title(prompt_request.prompt)
-        db.add(convo)
+        title = await generate_ai_conversation_title(prompt_request.prompt)
+        await run_in_threadpool(save_title, db, convo, title)
+
+    def build_prompt():
+        with span("prompt_build"):
+            prompt = build_prompt_with_history(
+                conversation_id,
+                prompt_request.prompt,
+                db
+            )
 
-    prompt = build_prompt_with_history(
-        conversation_id,
-        prompt_request.prompt,
-        db
-    )
+        # Don't hold a pooled DB connection while waiting on the model
+        db.close()
+        return prompt
 
-    answer = ask_model(prompt)
+    prompt = await run_in_threadpool(build_prompt)
 
-    user_msg = Message(
-        conversation_id=conversation_id,
-        role="user",
-        content=prompt_request.prompt
-    )
-    assistant_msg = Message(
-        conversation_id=conversation_id,
-        role="assistant",
-        content=answer
-    )
+    answer = await ask_model(prompt)
 
-    db.add_all([user_msg, assistant_msg])
-    db.commit()
+    await run_in_threadpool(save_turn, conversation_id, prompt_request.prompt, answer)
 
     return {"response": answer}
 
 @app.post("/embed_text")
-def get_embedding(request: TextRequest):
-    embedding = embed_text(request.text)
-    return {"embedding": embedding}
+def get_embedding(
+    request: TextRequest,
+    http_request: Request,
+    format: str | None = None,
+    dtype: str = "float32"
+):
+    format, dtype = negotiate(format, dtype, http_request.headers.get("accept"))
+    if format == "ndjson":
+        return ndjson_stream(iter_embedding_batches([request.text]))
+    return encode_embeddings(embed_array([request.text])[0], format, dtype, key="embedding")
 
 @app.post("/embed_texts")
-def get_embeddings(request: TextsRequest):
-    embeddings = embed_texts(request.texts)
-    return {"embeddings": embeddings}
+def get_embeddings(
+    request: TextsRequest,
+    http_request: Request,
+    format: str | None = None,
+    dtype: str = "float32"
+):
+    """
+    Output format from `?format=json|base64|binary|ndjson` or the Accept header.
+    ndjson streams results as each sub-batch is encoded.
+    """
+    format, dtype = negotiate(format, dtype, http_request.headers.get("accept"))
+    check_batch_size(request.texts, format)
+    if format == "ndjson":
+        return ndjson_stream(iter_embedding_batches(request.texts))
+    return encode_embeddings(embed_array(request.texts), format, dtype, key="embeddings")
 
 @app.post("/query_docs")
 def query_docs(request: QueryRequest):
     if vectorstore.index.ntotal == 0:
         raise HTTPException(status_code=500, detail="VectorStore is empty")
     query_embedding = embed_text(request.query)
-    results = vectorstore.search(query_embedding, top_k=request.top_k)
+    results = vectorstore.search(
+        query_embedding,
+        top_k=request.top_k,
+        min_similarity=request.min_similarity
+    )
     return {"results": results}
 
 @app.post("/ask_pdf/{conversation_id}")
@@ -295,53 +434,64 @@ async def ask_pdf_with_history(
     top_k: int = Form(5),
     db: Session = Depends(get_db)
 ):
-    convo = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+    convo = await run_in_threadpool(load_conversation, db, conversation_id)
     if not convo:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     # ✅ Generate AI title only once
     if convo.title == "New Conversation":
-        convo.title = generate_ai_conversation_title(question)
-        db.add(convo)
-
+        title = await generate_ai_conversation_title(question)
+        await run_in_threadpool(save_title, db, convo, title)
+
+    def build_prompt():
+        # Extract PDF and create temporary FAISS
+        pdf_text = extract_pdf_text(file.file)
+        with span("chunk"):
+            all_chunks = chunk_text(pdf_text)
+        with span("dedup"):
+            pdf_chunks = unique_chunks(all_chunks)
+        CHUNKS.labels(source="pdf").inc(len(all_chunks))
+        DUPLICATE_CHUNKS.labels(source="pdf").inc(len(all_chunks) - len(pdf_chunks))
+        question_embedding = embed_text(question)
+
+        if vectorstore.index.ntotal == 0:
+            legal_context = ""
+        else:
+            global_results = vectorstore.search_many(question_embedding, top_k=top_k)
+            legal_context = "\n\n".join(global_results.texts())
+
+        with TemporaryDirectory() as tmpdir:
+            temp_store = VectorStore(store_path=tmpdir)
+            chunk_embeddings = embed_texts(pdf_chunks) if pdf_chunks else []
+            with span("faiss_add"):
+                for chunk, chunk_embedding in zip(pdf_chunks, chunk_embeddings):
+                    temp_store.add_vector(chunk_embedding, {"text": chunk})
+            pdf_results = temp_store.search_many(question_embedding, top_k=top_k)
+            pdf_context = "\n\n".join(pdf_results.texts())
+
+        # Combine legal + PDF context
+        combined_rag_context = "\n\n".join(filter(None, [legal_context, pdf_context]))
+
+        # Build prompt including chat history + RAG context
+        with span("prompt_build"):
+            prompt = build_prompt_with_history(
+                conversation_id,
+                question,
+                db,
+                pdf_context=combined_rag_context
+            )
 
-    # Extract PDF and create temporary FAISS
-    pdf_text = extract_pdf_text(file.file)
-    pdf_chunks = chunk_text(pdf_text)
-    question_embedding = embed_text(question)
+        # Don't hold a pooled DB connection while waiting on the model
+        db.close()
+        return prompt
 
-    if vectorstore.index.ntotal == 0:
-        legal_context = ""
-    else:
-        global_results = vectorstore.search(question_embedding, top_k=top_k)
-        legal_context = "\n\n".join(r['metadata']['text'] for r in global_results)
-
-    with TemporaryDirectory() as tmpdir:
-        temp_store = VectorStore(store_path=tmpdir)
-        for chunk in pdf_chunks:
-            temp_store.add_vector(embed_text(chunk), {"text": chunk})
-        pdf_results = temp_store.search(question_embedding, top_k=top_k)
-        pdf_context = "\n\n".join(r['metadata']['text'] for r in pdf_results)
-
-    # Combine legal + PDF context
-    combined_rag_context = "\n\n".join(filter(None, [legal_context, pdf_context]))
-
-    # Build prompt including chat history + RAG context
-    prompt = build_prompt_with_history(
-        conversation_id,
-        question,
-        db,
-        pdf_context=combined_rag_context
-    )
+    prompt = await run_in_threadpool(build_prompt)
 
     # Get model response
-    answer = ask_model(prompt)
+    answer = await ask_model(prompt)
 
-    # Store messages
-    user_msg = Message(conversation_id=conversation_id, role="user", content=question)
-    assistant_msg = Message(conversation_id=conversation_id, role="assistant", content=answer)
-    db.add_all([user_msg, assistant_msg])
-    db.commit()
+    # Store messages (batched insert)
+    await run_in_threadpool(save_turn, conversation_id, question, answer)
 
     return {"answer": answer}
 
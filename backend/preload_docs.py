@@ -3,10 +3,12 @@ from pathlib import Path
 from PyPDF2 import PdfReader
 import docx
 import argparse
+import time
 from embeddings import embed_texts
 from vectorstore import VectorStore
 from dotenv import load_dotenv
 from utils import chunk_text
+from dedup import NearDuplicateIndex, DEDUP_THRESHOLD
 
 # Load environment variables from .env (for OpenAI keys, VECTORSTORE_PATH, etc.)
 load_dotenv()
@@ -22,6 +24,17 @@ parser.add_argument(
     default=None,
     help="Directory containing documents (overrides env var DOCS_DIR)"
 )
+parser.add_argument(
+    "--dedup-threshold",
+    type=float,
+    default=DEDUP_THRESHOLD,
+    help="Estimated Jaccard similarity at which chunks are treated as near-duplicates"
+)
+parser.add_argument(
+    "--no-dedup",
+    action="store_true",
+    help="Embed every chunk, including near-duplicates"
+)
 args = parser.parse_args()
 
 # Use CLI args if provided, else fallback to env vars, else default
@@ -59,6 +72,16 @@ def main():
         print("⚠️ No documents found in the docs directory. Exiting.")
         return
 
+    # Seed with chunks already in the store so re-runs don't re-add them
+    dedup = None if args.no_dedup else NearDuplicateIndex(threshold=args.dedup_threshold)
+    if dedup is not None:
+        for i, meta in enumerate(vectorstore.metadata):
+            dedup.find_or_add(i, meta["text"])
+
+    total_chunks = 0
+    embedded_chunks = 0
+    embed_seconds = 0.0
+
     for file in doc_files:
         if file.suffix.lower() == ".pdf":
             text = load_pdf(file)
@@ -71,20 +94,53 @@ def main():
             continue
 
         chunks = chunk_text(text)
-        embeddings = embed_texts(chunks)
-
-        for i, embedding in enumerate(embeddings):
-            metadata = {
-                "source": str(file.name),
-                "chunk_index": i,
-                "text": chunks[i]
-            }
-            vectorstore.add_vector(embedding, metadata)
-
-        print(f"✅ Processed {file.name} into {len(chunks)} chunks.")
+        total_chunks += len(chunks)
+
+        # Near-duplicates (of this file or anything indexed before) are not
+        # embedded again; they are listed as extra sources on the canonical chunk
+        pending = []
+        for i, chunk in enumerate(chunks):
+            source = {"source": str(file.name), "chunk_index": i}
+            chunk_id = len(vectorstore.metadata) + len(pending)
+            duplicate_of = dedup.find_or_add(chunk_id, chunk) if dedup is not None else None
+
+            if duplicate_of is None:
+                pending.append({**source, "text": chunk, "sources": [source]})
+                continue
+
+            if duplicate_of < len(vectorstore.metadata):
+                canonical = vectorstore.metadata[duplicate_of]
+            else:
+                canonical = pending[duplicate_of - len(vectorstore.metadata)]
+            sources = canonical.setdefault(
+                "sources",
+                [{"source": canonical["source"], "chunk_index": canonical["chunk_index"]}]
+            )
+            if source not in sources:
+                sources.append(source)
+
+        if pending:
+            start = time.perf_counter()
+            embeddings = embed_texts([meta["text"] for meta in pending])
+            embed_seconds += time.perf_counter() - start
+
+            for embedding, metadata in zip(embeddings, pending):
+                vectorstore.add_vector(embedding, metadata)
+        embedded_chunks += len(pending)
+
+        print(f"✅ Processed {file.name} into {len(chunks)} chunks ({len(chunks) - len(pending)} near-duplicates).")
 
     vectorstore.save()
     print(f"✅ Vectorstore saved at: {VECTORSTORE_PATH}")
 
+    if total_chunks:
+        skipped = total_chunks - embedded_chunks
+        per_chunk = embed_seconds / embedded_chunks if embedded_chunks else 0.0
+        print(
+            f"📉 Dedup: {total_chunks} chunks -> {embedded_chunks} vectors "
+            f"({100 * skipped / total_chunks:.1f}% smaller index), "
+            f"~{skipped * per_chunk:.1f}s of embedding saved ({embed_seconds:.1f}s spent)"
+        )
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
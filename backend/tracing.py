@@ -0,0 +1,128 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from prometheus_client import Counter, Gauge, Histogram
+
+# ------------------------------
+# Metrics
+# ------------------------------
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds",
+    "Time spent in each request stage",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+LLM_TOKENS = Counter("rag_llm_tokens_total", "Tokens reported by the LLM provider", ["kind"])
+LLM_EVENTS = Counter("rag_llm_events_total", "LLM gateway retries and rejections", ["event"])
+CHUNKS = Counter("rag_chunks_total", "Text chunks processed", ["source"])
+DUPLICATE_CHUNKS = Counter("rag_duplicate_chunks_total", "Near-duplicate chunks skipped before embedding", ["source"])
+EMBEDDED_TEXTS = Counter("rag_embedded_texts_total", "Texts passed to the embedding model")
+DROPPED_MESSAGES = Counter("rag_dropped_messages_total", "Chat messages that could not be persisted")
+CACHE_EVENTS = Counter("rag_cache_events_total", "Cache lookups", ["cache", "result"])
+INDEX_VECTORS = Gauge("rag_index_vectors", "Vectors in the global FAISS index")
+INDEX_BYTES = Gauge("rag_index_bytes", "Approximate memory held by the global FAISS index")
+
+PROFILE_HEADER = "X-Profile"
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+
+
+class RequestTrace:
+    """Per-request record of stage timings and the threads that ran them."""
+
+    def __init__(self):
+        self.spans = []  # (stage, seconds)
+        self.threads = set()
+
+
+_current_trace: ContextVar = ContextVar("current_trace", default=None)
+
+
+def start_trace() -> RequestTrace:
+    trace = RequestTrace()
+    _current_trace.set(trace)
+    return trace
+
+
+@contextmanager
+def span(stage: str):
+    """Time a stage into the `rag_stage_seconds` histogram and the current trace."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.threads.add(threading.get_ident())
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        if trace is not None:
+            trace.spans.append((stage, elapsed))
+
+
+def server_timing(trace: RequestTrace) -> str:
+    """Render a trace as a `Server-Timing` header value (durations in ms)."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in trace.spans)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_EVENTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of the threads a request's spans ran on.
+
+    Writes collapsed stacks (one `frame;frame;frame count` line per stack,
+    the format flamegraph tools read) to `PROFILE_DIR/<id>.folded`. A failed
+    write is logged and never fails the request being profiled.
+    """
+
+    def __init__(self, trace: RequestTrace, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.trace = trace
+        self.interval = interval
+        self.samples = StackCounter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Path | None:
+        """Stop sampling and write the profile; returns its path, or None if it couldn't be written."""
+        self._stop.set()
+        self._thread.join()
+        path = PROFILE_DIR / f"{uuid.uuid4().hex}.folded"
+        try:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                for stack, count in self.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            print(f"⚠️ Could not write profile to {path}: {e}")
+            return None
+        return path
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for tid in list(self.trace.threads):
+                frame = frames.get(tid)
+                if frame is not None:
+                    self.samples[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
@@ -3,6 +3,62 @@ import os
 import pickle
 from pathlib import Path
 import numpy as np
+from tracing import span
+
+
+def distance_to_similarity(distances):
+    """
+    Map `IndexFlatL2` distances (squared L2) to cosine similarity.
+
+    For unit-norm vectors, as all-MiniLM-L6-v2 produces, |a - b|^2 = 2 - 2 cos,
+    so the score is in [-1, 1] (1.0 == identical, ~0 == unrelated).
+    """
+    return 1.0 - np.asarray(distances, dtype="float32") / 2.0
+
+
+class SearchResults:
+    """
+    Array-backed FAISS hits for one or more queries.
+
+    `ids` and `distances` (squared L2) have shape (n_queries, top_k). Slots that FAISS
+    could not fill (top_k > ntotal) or that fell below `min_similarity`
+    hold id -1. Metadata is only looked up when `hits()` is called.
+    """
+
+    def __init__(self, ids: np.ndarray, distances: np.ndarray, metadata: list):
+        self.ids = ids
+        self.distances = distances
+        self._metadata = metadata
+
+    def __len__(self):
+        return self.ids.shape[0]
+
+    @property
+    def similarities(self) -> np.ndarray:
+        return distance_to_similarity(self.distances)
+
+    @property
+    def mask(self) -> np.ndarray:
+        return self.ids >= 0
+
+    def counts(self) -> np.ndarray:
+        """Number of valid hits per query."""
+        return self.mask.sum(axis=1)
+
+    def hits(self, query: int = 0) -> list:
+        """Materialize `{"metadata", "distance"}` dicts for one query."""
+        row_ids = self.ids[query]
+        valid = row_ids >= 0
+        row_ids = row_ids[valid].tolist()
+        row_dists = self.distances[query][valid].tolist()
+        return [
+            {"metadata": self._metadata[idx], "distance": dist}
+            for idx, dist in zip(row_ids, row_dists)
+        ]
+
+    def texts(self, query: int = 0) -> list:
+        return [self._metadata[idx]["text"] for idx in self.ids[query] if idx >= 0]
+
 
 class VectorStore:
     def __init__(self, store_path: str, embedding_dim: int = 384):
@@ -29,6 +85,10 @@ class VectorStore:
         self.metadata.append(meta)
         self.index.add(np.array([vector], dtype='float32'))
 
+    def memory_bytes(self) -> int:
+        """Approximate size of the stored vectors (flat float32 index)."""
+        return self.index.ntotal * self.index.d * 4
+
     def save(self):
         self.store_path.mkdir(parents=True, exist_ok=True)
         faiss.write_index(self.index, str(self.index_path))
@@ -40,18 +100,34 @@ class VectorStore:
         with open(self.meta_path, "rb") as f:
             self.metadata = pickle.load(f)
 
-    def search(self, query_vector: list, top_k: int = 5):
-        import numpy as np
+    def search_many(self, query_vectors, top_k: int = 5, min_similarity: float = None) -> SearchResults:
+        """
+        Search one or many query vectors at once.
+
+        `query_vectors` may be a single vector or a 2D array-like of shape
+        (n_queries, embedding_dim). Hits whose cosine similarity is below
+        `min_similarity` (see `distance_to_similarity`) are masked out with id -1.
+        """
+        queries = np.ascontiguousarray(query_vectors, dtype='float32')
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+
+        k = min(top_k, self.index.ntotal)
+        if k <= 0:
+            empty = np.empty((queries.shape[0], 0))
+            return SearchResults(empty.astype('int64'), empty.astype('float32'), self.metadata)
+
+        with span("faiss_search"):
+            distances, ids = self.index.search(queries, k)
+
+        if min_similarity is not None:
+            # cosine >= s  <=>  squared distance <= 2 - 2s
+            ids = np.where(distances <= 2.0 - 2.0 * min_similarity, ids, -1)
+
+        return SearchResults(ids, distances, self.metadata)
 
+    def search(self, query_vector: list, top_k: int = 5, min_similarity: float = None):
         if self.index.ntotal == 0:
             return []
 
-        query = np.array([query_vector], dtype='float32')
-        distances, indices = self.index.search(query, top_k)
-        results = []
-        for idx, dist in zip(indices[0], distances[0]):
-            results.append({
-                "metadata": self.metadata[idx],
-                "distance": float(dist)
-            })
-        return results
+        return self.search_many(query_vector, top_k=top_k, min_similarity=min_similarity).hits(0)